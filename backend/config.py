@@ -14,11 +14,15 @@ class Settings(BaseSettings):
     database_url: str
     hash_scheme: str = "argon2"
     secret_key: str
+    admin_token: str = ""
     app_env: str = "development"
     port: int = 8000
     argon2_time_cost: int = 3
     argon2_memory_cost: int = 65536
     argon2_parallelism: int = 4
+    memory_budget_mb: int = 0
+    memory_warning_ratio: float = 0.8
+    memory_tracemalloc: bool = False
 
 
 settings = Settings()
@@ -1,9 +1,11 @@
 """Main FastAPI application."""
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from routes.auth import router as auth_router
+from routes.admin import router as admin_router
 from database import init_db
+import memory
 import logging
 
 # Configure logging
@@ -19,6 +21,7 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     # Startup
     logger.info("Starting application...")
+    memory.start_tracemalloc()
     await init_db()
     logger.info("Application started successfully")
     yield
@@ -42,8 +45,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def track_endpoint_memory(request: Request, call_next):
+    """Record per-endpoint memory usage, including Argon2 hash memory."""
+    with memory.track_request() as usage:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    # Unmatched paths are skipped so arbitrary URLs cannot grow the stats table
+    if route is not None:
+        memory.record_endpoint_usage(f"{request.method} {route.path}", usage)
+    return response
+
+
 # Include routers
 app.include_router(auth_router)
+app.include_router(admin_router)
 
 
 @app.get("/")
@@ -0,0 +1,211 @@
+"""Memory accounting for password hashing and per-endpoint allocations."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from config import settings
+import logging
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_hashes_in_flight = 0
+_hash_bytes_in_flight = 0
+_hash_bytes_peak = 0
+_over_budget = False
+_endpoint_stats: Dict[str, Dict[str, int]] = {}
+
+# Argon2 bytes charged to the current request; a mutable holder so hashes run
+# in worker threads (which get a copy of the context) still add to it
+_request_hash_bytes: ContextVar[Optional[list]] = ContextVar("request_hash_bytes", default=None)
+
+
+def hash_memory_bytes(params) -> int:
+    """
+    Memory allocated by a single Argon2 hash.
+
+    Args:
+        params: argon2 PasswordHasher or Parameters (memory_cost is in KiB)
+
+    Returns:
+        Number of bytes one hash or verify call allocates
+    """
+    return params.memory_cost * 1024
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Current resident set size of the process, or None if unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of the process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _budget_bytes() -> Optional[int]:
+    if not settings.memory_budget_mb:
+        return None
+    return settings.memory_budget_mb * 1024 * 1024
+
+
+def check_budget(incoming_bytes: int = 0) -> None:
+    """
+    Log a warning when RSS crosses the memory budget threshold.
+
+    Args:
+        incoming_bytes: Memory of a hash about to start; running hashes
+            are already part of RSS and must not be added again
+    """
+    global _over_budget
+
+    budget = _budget_bytes()
+    rss = current_rss_bytes()
+    if budget is None or rss is None:
+        return
+
+    threshold = budget * settings.memory_warning_ratio
+    with _lock:
+        over = rss + incoming_bytes >= threshold
+        # Log only on transitions instead of on every check while over
+        changed = over != _over_budget
+        _over_budget = over
+
+    if changed and over:
+        logger.warning(
+            f"Memory budget threshold crossed: rss={rss} bytes, "
+            f"incoming_hash={incoming_bytes} bytes, budget={budget} bytes"
+        )
+    elif changed:
+        logger.info(f"Memory usage back under budget threshold: rss={rss} bytes")
+
+
+@contextmanager
+def track_hash(size: int):
+    """
+    Account for the memory of one Argon2 hash while it runs.
+
+    Args:
+        size: Bytes the hash allocates, see hash_memory_bytes
+    """
+    global _hashes_in_flight, _hash_bytes_in_flight, _hash_bytes_peak
+
+    charged = _request_hash_bytes.get()
+    with _lock:
+        _hashes_in_flight += 1
+        _hash_bytes_in_flight += size
+        _hash_bytes_peak = max(_hash_bytes_peak, _hash_bytes_in_flight)
+        if charged is not None:
+            charged[0] += size
+    check_budget(size)
+    try:
+        yield
+    finally:
+        with _lock:
+            _hashes_in_flight -= 1
+            _hash_bytes_in_flight -= size
+
+
+def start_tracemalloc() -> None:
+    """Start tracemalloc if Python heap retention tracking is enabled."""
+    if settings.memory_tracemalloc and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        logger.info("tracemalloc enabled for per-endpoint Python heap tracking")
+
+
+def _traced_bytes() -> Optional[int]:
+    if not tracemalloc.is_tracing():
+        return None
+    return tracemalloc.get_traced_memory()[0]
+
+
+@contextmanager
+def track_request():
+    """
+    Measure memory used by one request.
+
+    Yields a dict that is filled in when the block exits:
+    - hash_bytes: Argon2 memory charged to the request by track_hash
+    - rss_delta_bytes: RSS after the request minus RSS before it
+    - peak_rss_growth_bytes: how far the process peak RSS rose during it
+    - python_heap_retained_bytes: net Python heap still held afterwards
+      (tracemalloc only; excludes Argon2, which allocates in C)
+
+    RSS and tracemalloc figures are process-wide, so with concurrent
+    requests they include other requests' memory.
+    """
+    usage = {}
+    holder = [0]
+    token = _request_hash_bytes.set(holder)
+    rss_before = current_rss_bytes()
+    peak_before = peak_rss_bytes()
+    traced_before = _traced_bytes()
+    try:
+        yield usage
+    finally:
+        _request_hash_bytes.reset(token)
+        rss_after = current_rss_bytes()
+        traced_after = _traced_bytes()
+        usage["hash_bytes"] = holder[0]
+        usage["peak_rss_growth_bytes"] = peak_rss_bytes() - peak_before
+        if rss_before is not None and rss_after is not None:
+            usage["rss_delta_bytes"] = rss_after - rss_before
+        if traced_before is not None and traced_after is not None:
+            usage["python_heap_retained_bytes"] = traced_after - traced_before
+        check_budget()
+
+
+def record_endpoint_usage(endpoint: str, usage: dict) -> None:
+    """
+    Aggregate the memory usage of one request per endpoint.
+
+    Args:
+        endpoint: Route identifier, e.g. "POST /api/register"
+        usage: Measurements produced by track_request
+    """
+    with _lock:
+        stats = _endpoint_stats.setdefault(endpoint, {"requests": 0})
+        stats["requests"] += 1
+        for key, value in usage.items():
+            stats[f"total_{key}"] = stats.get(f"total_{key}", 0) + value
+            stats[f"max_{key}"] = max(stats.get(f"max_{key}", value), value)
+
+
+def snapshot() -> dict:
+    """Collect the current memory statistics of this process."""
+    check_budget()
+
+    traced = None
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        traced = {"current_bytes": current, "peak_bytes": peak}
+
+    with _lock:
+        endpoints = {name: dict(stats) for name, stats in _endpoint_stats.items()}
+        hashing = {
+            "in_flight": _hashes_in_flight,
+            "in_flight_bytes": _hash_bytes_in_flight,
+            "peak_in_flight_bytes": _hash_bytes_peak,
+        }
+        over_budget = _over_budget
+
+    return {
+        "rss_bytes": current_rss_bytes(),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "budget_bytes": _budget_bytes(),
+        "over_budget": over_budget,
+        "hashing": hashing,
+        "tracemalloc": traced,
+        "endpoints": endpoints,
+    }
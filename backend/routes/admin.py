@@ -0,0 +1,43 @@
+"""Admin routes."""
+from fastapi import APIRouter, Header, HTTPException, status
+from typing import Optional
+from config import settings
+from utils import _hasher
+import memory
+import logging
+import secrets
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def _check_admin_token(token: Optional[str]) -> None:
+    """Reject the request unless the token matches ADMIN_TOKEN."""
+    # An empty ADMIN_TOKEN disables the admin endpoints entirely
+    if not settings.admin_token or token is None or not secrets.compare_digest(
+        token.encode(), settings.admin_token.encode()
+    ):
+        logger.error("Admin request rejected: missing or invalid admin token")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
+        )
+
+
+@router.get(
+    "/memory",
+    summary="Memory statistics",
+    description="Process RSS, in-flight Argon2 memory and per-endpoint memory usage"
+)
+async def memory_stats(x_admin_token: Optional[str] = Header(None)):
+    """
+    Report memory usage of this worker process.
+
+    Requires the `X-Admin-Token` header to match `ADMIN_TOKEN`.
+    """
+    _check_admin_token(x_admin_token)
+
+    stats = memory.snapshot()
+    stats["hashing"]["bytes_per_hash"] = memory.hash_memory_bytes(_hasher)
+    return stats
@@ -0,0 +1,191 @@
+"""Tests for memory accounting."""
+import logging
+import tracemalloc
+import pytest
+from argon2 import PasswordHasher
+from httpx import AsyncClient
+from main import app
+from config import settings
+from utils import _hasher, hash_password, verify_password
+import memory
+
+
+@pytest.fixture(autouse=True)
+def isolated_memory_state(monkeypatch):
+    """Reset module-global memory stats for each test."""
+    monkeypatch.setattr(memory, "_endpoint_stats", {})
+    monkeypatch.setattr(memory, "_over_budget", False)
+    monkeypatch.setattr(memory, "_hash_bytes_peak", 0)
+
+
+@pytest.fixture
+def admin_headers(monkeypatch):
+    """Configure an admin token and return headers carrying it."""
+    monkeypatch.setattr(settings, "admin_token", "test-admin-token")
+    return {"X-Admin-Token": "test-admin-token"}
+
+
+@pytest.fixture
+def traced():
+    """Run the test with tracemalloc enabled."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    yield
+    if started:
+        tracemalloc.stop()
+
+
+@pytest.fixture
+def hashing_route():
+    """Mount a route that hashes a password, removed after the test."""
+    async def hash_once():
+        hash_password("Password123!")
+        return {}
+
+    app.add_api_route("/test-hash", hash_once, methods=["POST"])
+    route = app.router.routes[-1]
+    yield "POST /test-hash"
+    app.router.routes.remove(route)
+
+
+def test_hash_memory_bytes_matches_memory_cost():
+    """Test per-hash memory is derived from the Argon2 memory cost."""
+    assert memory.hash_memory_bytes(_hasher) == settings.argon2_memory_cost * 1024
+
+
+def test_track_hash_counts_in_flight():
+    """Test in-flight hash memory is counted during a hash and released after."""
+    size = memory.hash_memory_bytes(_hasher)
+    before = memory.snapshot()["hashing"]
+    with memory.track_hash(size):
+        during = memory.snapshot()["hashing"]
+    after = memory.snapshot()["hashing"]
+
+    assert during["in_flight"] == before["in_flight"] + 1
+    assert during["in_flight_bytes"] == before["in_flight_bytes"] + size
+    assert during["peak_in_flight_bytes"] == during["in_flight_bytes"]
+    assert after["in_flight"] == before["in_flight"]
+    assert after["in_flight_bytes"] == before["in_flight_bytes"]
+
+
+def test_track_request_charges_hashes():
+    """Test hashes made during a request are charged to it."""
+    with memory.track_request() as usage:
+        hash_password("Password123!")
+        hash_password("Password123!")
+
+    assert usage["hash_bytes"] == 2 * memory.hash_memory_bytes(_hasher)
+    assert usage["peak_rss_growth_bytes"] >= 0
+    assert "python_heap_retained_bytes" not in usage
+
+
+def test_verify_charges_memory_cost_of_stored_hash():
+    """Test verify is charged the memory cost stored in the hash."""
+    old_hasher = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1)
+    password_hash = old_hasher.hash("Password123!")
+
+    with memory.track_request() as usage:
+        assert verify_password(password_hash, "Password123!") is True
+
+    assert usage["hash_bytes"] == 8192 * 1024
+
+
+def test_budget_check_ignores_running_hashes(monkeypatch):
+    """Test in-flight hash memory is not added on top of RSS again."""
+    rss = memory.current_rss_bytes()
+    budget_mb = rss // (1024 * 1024) + 16
+    monkeypatch.setattr(settings, "memory_budget_mb", budget_mb)
+    monkeypatch.setattr(settings, "memory_warning_ratio", 1.0)
+    monkeypatch.setattr(memory, "_hash_bytes_in_flight", 1024 * 1024 * 1024)
+
+    assert memory.snapshot()["over_budget"] is False
+
+
+def test_budget_warning_logged_once(monkeypatch, caplog):
+    """Test crossing the memory budget logs a single warning."""
+    monkeypatch.setattr(settings, "memory_budget_mb", 1)
+
+    with caplog.at_level(logging.WARNING, logger="memory"):
+        hash_password("Password123!")
+        hash_password("Password123!")
+
+    warnings = [r for r in caplog.records if "budget threshold crossed" in r.getMessage()]
+    assert len(warnings) == 1
+    assert memory.snapshot()["over_budget"] is True
+
+
+def test_over_budget_cleared_by_snapshot(monkeypatch):
+    """Test the over-budget flag is re-evaluated when stats are read."""
+    monkeypatch.setattr(settings, "memory_budget_mb", 1)
+    assert memory.snapshot()["over_budget"] is True
+
+    monkeypatch.setattr(settings, "memory_budget_mb", 1024 * 1024)
+    assert memory.snapshot()["over_budget"] is False
+
+
+def test_record_endpoint_usage():
+    """Test request usage is aggregated per endpoint."""
+    memory.record_endpoint_usage("GET /test", {"hash_bytes": 100})
+    memory.record_endpoint_usage("GET /test", {"hash_bytes": 300})
+
+    stats = memory.snapshot()["endpoints"]["GET /test"]
+    assert stats == {"requests": 2, "total_hash_bytes": 400, "max_hash_bytes": 300}
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_matched_routes_only(traced):
+    """Test the middleware keys stats by route and skips unmatched paths."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        await ac.get("/health")
+        await ac.get("/health")
+        await ac.get("/does-not-exist")
+
+    endpoints = memory.snapshot()["endpoints"]
+    assert list(endpoints) == ["GET /health"]
+    stats = endpoints["GET /health"]
+    assert stats["requests"] == 2
+    assert stats["total_hash_bytes"] == 0
+    assert "max_python_heap_retained_bytes" in stats
+    assert "max_rss_delta_bytes" in stats
+
+
+@pytest.mark.asyncio
+async def test_middleware_charges_hash_to_route(hashing_route):
+    """Test a hash inside a routed request is charged to that endpoint."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/test-hash")
+    assert response.status_code == 200
+
+    stats = memory.snapshot()["endpoints"][hashing_route]
+    assert stats["requests"] == 1
+    assert stats["total_hash_bytes"] == memory.hash_memory_bytes(_hasher)
+
+
+@pytest.mark.asyncio
+async def test_admin_memory_endpoint(admin_headers):
+    """Test admin memory endpoint reports RSS and hashing stats."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/admin/memory", headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["peak_rss_bytes"] > 0
+    assert body["hashing"]["bytes_per_hash"] == settings.argon2_memory_cost * 1024
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "wrong"}])
+async def test_admin_memory_endpoint_rejects_invalid_token(admin_headers, headers):
+    """Test admin memory endpoint returns 403 on a missing or wrong token."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/admin/memory", headers=headers)
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_admin_memory_endpoint_disabled_without_token(monkeypatch):
+    """Test admin memory endpoint is disabled when ADMIN_TOKEN is empty."""
+    monkeypatch.setattr(settings, "admin_token", "")
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/admin/memory", headers={"X-Admin-Token": ""})
+    assert response.status_code == 403
@@ -1,7 +1,8 @@
 """Utility functions for password hashing."""
-from argon2 import PasswordHasher
+from argon2 import PasswordHasher, extract_parameters
 from argon2.exceptions import VerifyMismatchError
 from config import settings
+from memory import hash_memory_bytes, track_hash
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,7 +25,8 @@ def hash_password(password: str) -> str:
     Returns:
         Hashed password string
     """
-    return _hasher.hash(password)
+    with track_hash(hash_memory_bytes(_hasher)):
+        return _hasher.hash(password)
 
 
 def verify_password(password_hash: str, password: str) -> bool:
@@ -38,8 +40,11 @@ def verify_password(password_hash: str, password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
+    # Verify uses the memory cost stored in the hash, not the current settings
+    size = hash_memory_bytes(extract_parameters(password_hash))
     try:
-        _hasher.verify(password_hash, password)
+        with track_hash(size):
+            _hasher.verify(password_hash, password)
         return True
     except VerifyMismatchError:
         return False